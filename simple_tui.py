@@ -7,19 +7,251 @@ Simple Python curses TUI that calls the TypeScript backend
 import curses
 import json
 import subprocess
+import sys
 import threading
 import queue
 import time
 import os
 import pty
 import select
+import selectors
 import fcntl
+import itertools
+import functools
+import codecs
+import textwrap
+import types
+import re
+from collections import Counter, deque
 from datetime import datetime
 
+# orjson is optional; it parses the backend's JSON lines several times faster.
+# Both loads() accept bytes, so lines are parsed without decoding them first.
+try:
+    from orjson import loads as _loads
+except ImportError:
+    _loads = json.loads
+
+# Shared wrapper so the compiled chunking regexes are reused across calls. Words
+# are split on whitespace only and never broken, like the original word loop.
+_wrapper = textwrap.TextWrapper(drop_whitespace=True, break_long_words=False, break_on_hyphens=False)
+
+# ANSI CSI sequences and OSC strings, stripped once when PTY output is buffered
+_ANSI_RE = re.compile(r'\x1b\[[0-?]*[ -/]*[@-~]|\x1b\][^\x07]*\x07')
+_STRIP_CR = str.maketrans('', '', '\r')
+
+# Shared read-only default for missing metadata, so lookups never allocate a dict
+EMPTY_DICT = types.MappingProxyType({})
+
+# Shortcut toggles: current value -> next value
+_NEXT_PROVIDER = {"claude": "gemini", "gemini": "local", "local": "claude"}
+_NEXT_PERSONALITY = {"ani": "professional", "professional": "casual", "casual": "ani"}
+_NEXT_VIEW = {"personality": "claude_raw", "claude_raw": "personality"}
+
+# Longest wait for the Claude PTY to accept more input before giving up on a send
+_PTY_WRITE_TIMEOUT = 1.0
+
+# Redraws are coalesced to at most ~60 frames per second
+_FRAME_INTERVAL = 1 / 60
+_FRAME_MS = 16
+
+# Written on stderr by `direct.ts --serve` after each response frame, see send_message()
+_REQUEST_END_LINE = b'{"type":"request_end"}'
+
+# Engine events applied per main-loop pass, so a burst can't stall keystrokes
+_EVENTS_PER_TICK = 64
+
+# Response cleanup, see clean_response_formatting()
+_MARKDOWN_STRIP = str.maketrans('', '', '*_')
+_MULTI_NL_RE = re.compile(r'\n{3,}')
+_MULTI_SP_RE = re.compile(r' {2,}')
+_ESCAPES_RE = re.compile(r'\\([n"])')
+_ESCAPE_CHARS = {'n': '\n', '"': '"'}
+
+# stderr message types, interned so decoded types can match them by identity
+TYPE_ASSISTANT = sys.intern('assistant_message')
+TYPE_TOOL_ACTIVITY = sys.intern('tool_activity')
+TYPE_TOOL_BLURB = sys.intern('tool_blurb')
+TYPE_ENGINE = sys.intern('engine')
+TYPE_ERROR = sys.intern('error')
+
+# Engine events that are debugging detail, never shown in the chat
+_DEBUG_NOISE_KEYWORDS = (
+    'ollama_request_enqueued',
+    'ollama_queue_reordered',
+    'ollama_request_processing_start',
+    'ollama_api_call_start',
+    'ollama_model_switch_delay',
+    'ollama_queue_processing_start',
+    'ollama_queue_processing_complete',
+    'intent_calling_gemma',
+    'intent_gemma_response',
+    'intent_parsing_response',
+    'intent_parsed_successfully',
+    'deepseek_json_debug',
+    'error_context_agent_initializing',
+    'error_context_agent_initialized',
+    'component_status_changed',
+    'processMessage_start',
+    'input_routing_start',
+    'input_routing_complete',
+    'recursive_validation_iteration',
+    'recursive_validation_analysis',
+    'recursive_validation_satisfied',
+)
+
+# Engine progress events worth showing
+_IMPORTANT_KEYWORDS = (
+    'system_state_changed',
+    'intelligence_router_start',
+    'intelligence_router_complete',
+    'tools_agent_start',
+    'tools_agent_executing_step',
+    'subconscious_reasoning_start',
+    'subconscious_reasoning_complete',
+    'personality_interpretation_start',
+    'personality_interpretation_success',
+    'ollama_request_success',  # Show completions but not detailed debug
+)
+
+# One alternation per list so a message is scanned once instead of once per keyword
+_NOISE_RE = re.compile('|'.join(map(re.escape, _DEBUG_NOISE_KEYWORDS)))
+_IMPORTANT_RE = re.compile('|'.join(map(re.escape, _IMPORTANT_KEYWORDS)))
+# DebugLogger.logEngineEvent sends engine events as "Engine <event_name>"
+_NOISE_PREFIXES = tuple('Engine ' + k for k in _DEBUG_NOISE_KEYWORDS)
+
+@functools.lru_cache(maxsize=512)
+def _ignore_decision(message, msg_type):
+    """Ignore decision for (message, msg_type); pure, so repeated events hit the cache"""
+    if msg_type == TYPE_ERROR:
+        # Only show user-relevant errors, not internal debugging ones
+        return 'all_json_blocks_failed' in message or 'deepseek_json_debug' in message
+
+    if msg_type != TYPE_ENGINE:
+        return False  # Always show non-engine messages
+
+    # Engine events read "Engine <event_name>", so a noisy event name is a prefix test
+    if message.startswith(_NOISE_PREFIXES):
+        return True
+
+    # Check if message contains debug noise
+    if _NOISE_RE.search(message):
+        return True
+
+    # Check if message contains important updates
+    if _IMPORTANT_RE.search(message):
+        return False
+
+    # Default: ignore other engine messages to reduce noise
+    return True
+
+# Enhanced welcome message with help, shown once at startup
+_WELCOME_CONTENT = (
+    '🎭 Welcome to Coquette Enhanced! \n\n'
+    'New Features:\n'
+    '• Real-time tool activity visualization\n'
+    '• Animated progress indicators\n'
+    '• Performance metrics\n'
+    '• Enhanced Ani personality responses\n'
+    '• Tool execution blurbs\n\n'
+    'Shortcuts:\n'
+    '• Ctrl+T: Provider (claude→gemini→local)\n'
+    '• Ctrl+L: Context (🧠/🔄)\n'
+    '• Ctrl+P: Personality (ani→prof→casual)\n'
+    '• Ctrl+O: Tools (local: 💬/🔧)\n'
+    '• Ctrl+V: View (personality/raw)\n'
+    '• Ctrl+R: Copy mode\n'
+    '• Ctrl+C: Exit\n\n'
+    'Type a message to see the enhanced visual feedback in action!'
+)
+
+# Status lines for engine events that repeat every turn
+_DEEPSEEK_STATUSES = tuple(
+    (f"🧠 DeepSeek thinking (attempt {i})...", f"DeepSeek reasoning (try {i})") for i in range(8)
+)
+
+@functools.lru_cache(maxsize=128)
+def _exec_status(tool_name, description):
+    """(status line, activity) for an executing tool step; the same steps recur all session"""
+    if description:
+        return f"🔧 {description}...", f"executing {tool_name}"
+    return f"🔧 Executing {tool_name}...", f"executing {tool_name}"
+
+# Engine event routes in priority order: (pattern, handler method). When several
+# match, the earliest route wins, as in the elif ladder this replaced.
+_ENGINE_ROUTES = (
+    ('system_state_changed', 'on_state_changed'),
+    ('file_operations_user_acknowledgment', 'on_file_ops_acknowledgment'),
+    ('loading_personality', 'on_loading_personality'),
+    ('file_operations_calling_gemma', 'on_file_ops_planning'),
+    ('file_operation_executing', 'on_file_operation_executing'),
+    ('personalizing|personality_interpretation', 'on_personalizing'),
+    ('intent_classification', 'on_intent_classification'),
+    ('intelligence_router', 'on_intelligence_router'),
+    ('tools_agent_start', 'on_tools_agent_start'),
+    ('tools_agent_executing_step', 'on_tools_agent_step'),
+    ('recursive_validation', 'on_recursive_validation'),
+    ('subconscious_reasoning', 'on_subconscious_reasoning'),
+    ('deepseek_attempt', 'on_deepseek_attempt'),
+    ('thinking', 'on_thinking'),
+    ('_complete|_success', 'on_complete'),
+    ('_failed|(?i:error)', 'on_failed'),  # 'error' in any case, without lowering the name
+)
+
+# One group per route inside a lookahead, so a single scan reports every route
+# that matches at each position, overlapping keywords included
+_ENGINE_ROUTE_RE = re.compile(
+    '(?=' + '|'.join(f'({pattern})' for pattern, _ in _ENGINE_ROUTES) + ')'
+)
+
+@functools.lru_cache(maxsize=256)
+def _engine_route(message):
+    """Index into _ENGINE_ROUTES of the highest-priority route matching message, or None"""
+    best = None
+    for match in _ENGINE_ROUTE_RE.finditer(message):
+        route = match.lastindex - 1
+        if best is None or route < best:
+            best = route
+            if best == 0:
+                break
+    return best
+
+# Engine events are serialized by JSON.stringify as {"type":"engine","message":"<event>",...}
+_ENGINE_EVENT_PREFIX = b'{"type":"engine","message":"'
+
+def engine_event_name(line):
+    """Pull the event name out of a raw engine line (bytes) without parsing it, or None"""
+    if not line.startswith(_ENGINE_EVENT_PREFIX):
+        return None
+    start = len(_ENGINE_EVENT_PREFIX)
+    end = line.find(b'"', start)
+    if end == -1:
+        return None
+    name = line[start:end]
+    # Escaped names need a real parse to compare correctly
+    if b'\\' in name:
+        return None
+    return name.decode('utf-8', errors='replace')
+
+class Message:
+    """A chat message; slots instead of a per-message dict keep the history compact"""
+    __slots__ = ('role', 'content', 'timestamp', 'tool', 'source', 'immediate', 'ts_text', 'wrap_cache')
+    
+    def __init__(self, role, content, timestamp, tool=None, source=None, immediate=False):
+        self.role = role
+        self.content = content
+        self.timestamp = timestamp
+        self.tool = tool
+        self.source = source
+        self.immediate = immediate
+        self.ts_text = None  # Formatted on first draw, see draw_messages()
+        self.wrap_cache = None  # Wrapped lines per width, see wrapped_lines()
+
 class CoquetteTUI:
     def __init__(self):
-        self.current_input = ""
+        self.input_buffer = bytearray()  # Typed text; only printable ASCII is accepted
         self.messages = []
+        self._role_counts = Counter()  # Running per-role totals for the title
         self.status = "Ready"
         self.provider = "claude"
         self.personality = "ani"
@@ -30,6 +262,11 @@ class CoquetteTUI:
         self.tools_enabled = False  # When provider=local: False=chat, True=MCP+tools
         self.view_mode = "personality"  # "personality" or "claude_raw"
         
+        # Screen regions that need repainting on the next draw_screen()
+        self._dirty = {'messages', 'status', 'input'}
+        self._drawn_layout = None
+        self._last_draw = 0.0  # time.monotonic() of the last frame, see request_redraw()
+        
         # Enhanced TUI state tracking
         self.error_contexts_loaded = False
         self.error_context_count = 0
@@ -47,22 +284,59 @@ class CoquetteTUI:
         self.last_response_time = 0
         self.total_messages_processed = 0
         
+        # Inputs the current status line was built from, see update_status()
+        self._status_key = None
+        self._status_text = None
+        self._status_tick = None
+        self._status_template = ""
+        
         # Claude PTY session for raw view
         self.claude_process = None
         self.claude_master = None
-        self.claude_output_buffer = []
+        self.claude_output_buffer = deque(maxlen=1000)  # Oldest lines fall off automatically
+        self.claude_selector = None
+        self.claude_stop = threading.Event()
+        self.claude_wakeup_r = None
+        self.claude_wakeup_w = None
+        self._utf8_decoder = None
+        self._line_residual = ""
         
         # Input queue for threaded processing
         self.input_queue = queue.Queue()
         self.response_queue = queue.Queue()
+        self.event_queue = queue.Queue(maxsize=1024)  # Parsed engine events, see pump_backend_stderr()
+        
+        # stderr message types, looked up by parse_system_message()
+        self._msg_handlers = {
+            TYPE_ASSISTANT: self.handle_assistant_message,
+            TYPE_TOOL_ACTIVITY: self.handle_tool_activity,
+            TYPE_TOOL_BLURB: self.handle_tool_blurb,
+            TYPE_ENGINE: self.handle_engine,
+        }
+        # Bound handlers for _ENGINE_ROUTES, indexed like the table
+        self._engine_handlers = [getattr(self, name) for _, name in _ENGINE_ROUTES]
+        
+        # Long-lived TypeScript backend, see start_backend()
+        self.backend_process = None
         
         # Debug logging
         self.debug_file = None
+        self._log_fh = None
+        self._log_queue = queue.Queue()
+        self._log_thread = None
         self.setup_debug_logging()
         
         # Start Claude PTY session for raw view
         self.start_claude_pty()
         
+        # Start the TypeScript backend so the first message doesn't pay for npm/node startup
+        try:
+            self.start_backend()
+        except Exception as e:
+            self.log_debug("backend_start_error", "Failed to start TypeScript backend", {
+                "error": str(e)
+            })
+        
     def init_colors(self):
         curses.start_color()
         curses.init_pair(1, curses.COLOR_CYAN, curses.COLOR_BLACK)    # User messages
@@ -83,6 +357,16 @@ class CoquetteTUI:
         debug_filename = f"python_tui_session_{timestamp}.json"
         self.debug_file = os.path.join(debug_dir, debug_filename)
         
+        # One persistent handle, written by a background thread off the request path
+        try:
+            self._log_fh = open(self.debug_file, "a", buffering=8192)
+        except OSError:
+            # Don't let debug logging break the TUI; log_debug becomes a no-op
+            self.debug_file = None
+            return
+        self._log_thread = threading.Thread(target=self.write_debug_log, daemon=True)
+        self._log_thread.start()
+        
         # Log session start
         self.log_debug("session", "Python TUI session started", {
             "provider": self.provider,
@@ -105,12 +389,33 @@ class CoquetteTUI:
         }
         
         try:
-            with open(self.debug_file, "a") as f:
-                f.write(json.dumps(debug_entry) + "\n")
+            self._log_queue.put_nowait(json.dumps(debug_entry))
         except Exception as e:
             # Don't let debug logging break the TUI
             pass
     
+    def write_debug_log(self):
+        """Background thread to drain queued debug entries into the log file"""
+        while True:
+            line = self._log_queue.get()
+            if line is None:
+                break
+            try:
+                self._log_fh.write(line + "\n")
+                # Flush once the burst is drained rather than per entry
+                if self._log_queue.empty():
+                    self._log_fh.flush()
+            except Exception:
+                pass
+        self._log_fh.close()
+    
+    def close_debug_logging(self):
+        """Flush pending debug entries and close the log file"""
+        if self._log_thread:
+            self._log_queue.put(None)
+            self._log_thread.join(timeout=2)
+            self._log_thread = None
+    
     def start_claude_pty(self):
         """Start Claude Code as PTY subprocess for raw view"""
         try:
@@ -129,9 +434,19 @@ class CoquetteTUI:
             # Close slave end in parent
             os.close(claude_slave)
             
+            # Carries partial multibyte sequences over between reads
+            self._utf8_decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+            self._line_residual = ""
+            
             # Make master non-blocking
             fcntl.fcntl(self.claude_master, fcntl.F_SETFL, os.O_NONBLOCK)
             
+            # Register the master once; the self-pipe lets stop_claude_pty() wake select()
+            self.claude_wakeup_r, self.claude_wakeup_w = os.pipe()
+            self.claude_selector = selectors.DefaultSelector()
+            self.claude_selector.register(self.claude_master, selectors.EVENT_READ)
+            self.claude_selector.register(self.claude_wakeup_r, selectors.EVENT_READ)
+            
             # Start thread to read Claude output
             self.claude_reader_thread = threading.Thread(target=self.read_claude_output, daemon=True)
             self.claude_reader_thread.start()
@@ -149,23 +464,147 @@ class CoquetteTUI:
     
     def read_claude_output(self):
         """Background thread to read output from Claude PTY"""
-        while self.claude_process and self.claude_process.poll() is None:
+        try:
+            while not self.claude_stop.is_set():
+                # Block until Claude writes or we are asked to shut down
+                for key, _ in self.claude_selector.select(timeout=None):
+                    if key.fd == self.claude_wakeup_r:
+                        return
+                    raw, eof = self.drain_claude_master()
+                    data = self._line_residual + self._utf8_decoder.decode(raw)
+                    data = _ANSI_RE.sub('', data).translate(_STRIP_CR)
+                    lines = data.splitlines(keepends=True)
+                    # Hold back a trailing partial line until the rest of it arrives
+                    if lines and not lines[-1].endswith('\n'):
+                        self._line_residual = lines.pop()
+                    else:
+                        self._line_residual = ""
+                    self.claude_output_buffer.extend(line.rstrip('\n') for line in lines)
+                    if eof:
+                        # Keep the last line even though Claude never terminated it
+                        tail = self._line_residual + self._utf8_decoder.decode(b'', final=True)
+                        tail = _ANSI_RE.sub('', tail).translate(_STRIP_CR)
+                        if tail:
+                            self.claude_output_buffer.append(tail)
+                        self._line_residual = ""
+                        return
+        finally:
+            self.claude_selector.unregister(self.claude_master)
+            self.claude_selector.unregister(self.claude_wakeup_r)
+            self.claude_selector.close()
+    
+    def drain_claude_master(self):
+        """Read everything already queued on the non-blocking PTY master
+        
+        Returns the bytes read and whether the PTY has closed, so a burst of
+        output costs one select() wakeup instead of one per 64KB read.
+        """
+        chunks = []
+        while True:
             try:
-                if select.select([self.claude_master], [], [], 0.1)[0]:
-                    data = os.read(self.claude_master, 1024).decode('utf-8', errors='ignore')
-                    if data:
-                        self.claude_output_buffer.extend(data.splitlines())
-                        # Keep buffer manageable
-                        if len(self.claude_output_buffer) > 1000:
-                            self.claude_output_buffer = self.claude_output_buffer[-500:]
-            except:
-                break
+                raw = os.read(self.claude_master, 65536)
+            except BlockingIOError:
+                return b''.join(chunks), False
+            except OSError:
+                # EIO once the Claude process exits and the slave side closes
+                return b''.join(chunks), True
+            if not raw:
+                return b''.join(chunks), True
+            chunks.append(raw)
+    
+    def stop_claude_pty(self):
+        """Stop the Claude PTY reader thread and terminate the session"""
+        self.claude_stop.set()
+        if self.claude_wakeup_w is not None:
+            try:
+                os.write(self.claude_wakeup_w, b'\0')
+            except OSError:
+                pass
+        if self.claude_process and self.claude_process.poll() is None:
+            self.claude_process.terminate()
+    
+    def start_backend(self):
+        """Start the TypeScript engine as a long-lived subprocess
+        
+        The engine reads one JSON request per line on stdin and answers with a
+        response frame on stdout, so npm/node startup is paid once per session
+        instead of once per message. Both pipes are pumped into response_queue;
+        engine events parsed from stderr also go to event_queue.
+        """
+        self.backend_process = subprocess.Popen(
+            ['npm', 'run', 'dev:direct', '--silent', '--', '--serve'],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd='.'
+        )
+        
+        # Drop anything left over from a previous backend
+        self.response_queue = queue.Queue()
+        self.event_queue = queue.Queue(maxsize=1024)
+        # Blocking readline() on dedicated threads: the curses getch() loop owns the
+        # main thread, so there is no event loop to hand these pipes to
+        threading.Thread(target=self.pump_backend_stream,
+                         args=(self.backend_process.stdout, 'out', self.response_queue), daemon=True).start()
+        threading.Thread(target=self.pump_backend_stderr,
+                         args=(self.backend_process.stderr, self.response_queue, self.event_queue), daemon=True).start()
+        
+        self.log_debug("backend_start", "TypeScript backend started", {
+            "pid": self.backend_process.pid
+        })
+    
+    def pump_backend_stream(self, stream, tag, output_queue):
+        """Background thread to push backend output lines onto a queue, then a None sentinel at EOF"""
+        for line in iter(stream.readline, b''):
+            output_queue.put((tag, line))
+        output_queue.put((tag, None))
+    
+    def pump_backend_stderr(self, stream, output_queue, event_queue):
+        """Background thread to parse engine events off the main thread, then pass each raw line on"""
+        for line in iter(stream.readline, b''):
+            if line.rstrip() == _REQUEST_END_LINE:
+                # Everything this request wrote to stderr is now queued
+                output_queue.put(('end', None))
+                continue
+            event = self.parse_system_message(line)
+            if event is not None:
+                # Blocks while the UI is behind, so a burst can't grow without bound
+                event_queue.put(event)
+            output_queue.put(('err', line))
+        output_queue.put(('err', None))
+    
+    def stop_backend(self):
+        """Close the backend's stdin so it exits after any in-flight request"""
+        if self.backend_process and self.backend_process.poll() is None:
+            try:
+                self.backend_process.stdin.close()
+                self.backend_process.wait(timeout=2)
+            except Exception:
+                self.backend_process.terminate()
     
     def send_to_claude_pty(self, text):
         """Send text to Claude PTY session"""
         if self.claude_master:
             try:
-                os.write(self.claude_master, (text + '\n').encode('utf-8'))
+                # Submit text and newline in one syscall without concatenating them first
+                buffers = [memoryview(text.encode('utf-8')), memoryview(b'\n')]
+                while buffers:
+                    try:
+                        written = os.writev(self.claude_master, buffers)
+                    except BlockingIOError:
+                        # Master is non-blocking; wait a bounded time for the PTY to take
+                        # more, so a Claude that stopped reading can't freeze the UI
+                        _, writable, _ = select.select([], [self.claude_master], [], _PTY_WRITE_TIMEOUT)
+                        if not writable:
+                            unsent = sum(len(buf) for buf in buffers)
+                            raise TimeoutError(f"Claude PTY not accepting input; dropped {unsent} bytes")
+                        continue
+                    # Drop what was fully written and trim a partial write
+                    while buffers and written >= len(buffers[0]):
+                        written -= len(buffers[0])
+                        buffers.pop(0)
+                    if written:
+                        buffers[0] = buffers[0][written:]
                 self.log_debug("claude_pty_input", "Sent input to Claude PTY", {
                     "message": text[:50] + "..." if len(text) > 50 else text
                 })
@@ -174,8 +613,52 @@ class CoquetteTUI:
                     "error": str(e)
                 })
         
+    def append_message(self, role, content, **fields):
+        """Append a chat message and keep the per-role counts in step"""
+        self.messages.append(Message(role, content, time.time(), **fields))
+        self._role_counts[role] += 1
+        self._dirty.add('messages')
+        
     def update_status(self):
         """Update status line with current state - Enhanced with system indicators"""
+        # Rebuild the template only when something it shows has changed or an
+        # engine event has overwritten the status since the last build
+        elapsed_sec = time.time() - self.tool_start_time if self.tool_start_time else 0
+        key = (self.provider, self.personality, self.view_mode, self.conversation_context,
+               self.tools_enabled, self.error_contexts_loaded, self.error_context_count,
+               self.file_operations_active, self.recovery_attempts, self.connection_status,
+               round(self.last_response_time, 1), self.current_tool_activity,
+               self.thinking, self.copy_mode)
+        # Animation ticks only change the dots and elapsed time
+        tick = None
+        if self.current_tool_activity:
+            tick = (self.tool_progress_dots, round(elapsed_sec, 1) if elapsed_sec > 2 else 0)
+        if self.status is not self._status_text:
+            self._status_key = None
+        
+        if key != self._status_key:
+            self._status_key = key
+            self._status_template = self.build_status_template()
+        elif tick == self._status_tick:
+            return
+        self._status_tick = tick
+        
+        if self.current_tool_activity:
+            # Animated progress dots
+            dots = "." * (self.tool_progress_dots % 4)
+            elapsed = ""
+            if elapsed_sec > 2:  # Show timing after 2 seconds
+                elapsed = f" ({elapsed_sec:.1f}s)"
+            status_text = self._status_template % (dots, elapsed)
+        else:
+            status_text = self._status_template
+        
+        self.status = status_text
+        self._status_text = status_text
+        self._dirty.add('status')
+        
+    def build_status_template(self):
+        """Build the status line, leaving %s slots for the activity dots and elapsed time"""
         context_icon = "🧠" if self.conversation_context else "🔄"
         
         # Compact status display
@@ -223,34 +706,74 @@ class CoquetteTUI:
         
         # Enhanced thinking/activity display
         if self.current_tool_activity:
-            # Animated progress dots
-            dots = "." * (self.tool_progress_dots % 4)
-            elapsed = ""
-            if self.tool_start_time:
-                elapsed_sec = time.time() - self.tool_start_time
-                if elapsed_sec > 2:  # Show timing after 2 seconds
-                    elapsed = f" ({elapsed_sec:.1f}s)"
-            status_text += f" | 🔧 {self.current_tool_activity}{dots}{elapsed}"
+            status_text = status_text.replace("%", "%%")
+            status_text += " | 🔧 " + self.current_tool_activity.replace("%", "%%") + "%s%s"
         elif self.thinking:
             status_text += " | 💭 thinking..."
             
         if self.copy_mode:
             status_text += " | 📋 COPY MODE (Ctrl+R to resume)"
         
-        self.status = status_text
+        return status_text
         
     def draw_screen(self):
-        """Draw the main screen"""
-        self.stdscr.clear()
+        """Draw the main screen, repainting only the regions marked dirty"""
         height, width = self.stdscr.getmaxyx()
         
         if self.view_mode == "claude_raw":
+            self.stdscr.erase()
             self.draw_claude_raw_screen(height, width)
+            curses.doupdate()
+            # Leaving the raw view repaints everything, so nothing stays pending
+            self._drawn_layout = None
+            self._dirty.clear()
+            self._last_draw = time.monotonic()
             return
         
+        # A resize or coming back from the raw view invalidates the whole screen
+        if (height, width) != self._drawn_layout:
+            self.stdscr.erase()
+            self._drawn_layout = (height, width)
+            self._dirty.update(('messages', 'status', 'input'))
+        elif not self._dirty:
+            return  # Nothing changed since the last frame
+        
+        if 'messages' in self._dirty:
+            self.draw_messages(height, width)
+        if 'status' in self._dirty:
+            self.draw_status(height, width)
+        if 'input' in self._dirty:
+            self.draw_input(height, width)
+        self._dirty.clear()
+            
+        # Stage the window and push the whole frame to the terminal in one write
+        self.stdscr.noutrefresh()
+        curses.doupdate()
+        self._last_draw = time.monotonic()
+        
+    def request_redraw(self):
+        """Draw pending changes, at most once per frame; skipped updates stay dirty"""
+        if self.copy_mode:
+            return
+        if time.monotonic() - self._last_draw >= _FRAME_INTERVAL:
+            self.draw_screen()
+        
+    def clear_rows(self, start, end):
+        """Blank screen rows start..end-1 before a region is redrawn"""
+        for y in range(start, end):
+            self.stdscr.move(y, 0)
+            self.stdscr.clrtoeol()
+        
+    def draw_messages(self, height, width):
+        """Draw the title and the message history"""
+        # Calculate areas - be more conservative with space
+        messages_height = height - 8  # Leave more room for status wrapping
+        messages_start = 2
+        self.clear_rows(0, messages_start + messages_height)
+        
         # Draw enhanced title with message count and performance
-        msg_count = len([m for m in self.messages if m['role'] == 'user'])
-        sys_count = len([m for m in self.messages if m['role'] == 'system'])
+        msg_count = self._role_counts['user']
+        sys_count = self._role_counts['system']
         
         title_parts = [f"🎭 Coquette Enhanced ({msg_count} msgs"]
         if sys_count > 0:
@@ -264,21 +787,17 @@ class CoquetteTUI:
             title = title[:width-7] + "..."
         self.stdscr.addstr(0, max(1, (width - len(title)) // 2), title, curses.color_pair(3) | curses.A_BOLD)
         
-        # Calculate areas - be more conservative with space
-        messages_height = height - 8  # Leave more room for status wrapping
-        messages_start = 2
-        
         # Display messages with proper line counting
         visible_messages = []
         total_lines_used = 0
         
         for msg in reversed(self.messages):
             # Calculate how many lines this message will use
-            content_lines = self.wrap_text(msg['content'], width - 20)
+            content_lines = self.wrapped_lines(msg, width - 20)
             message_lines = max(1, len(content_lines))  # At least 1 line per message
             
             if total_lines_used + message_lines <= messages_height:
-                visible_messages.insert(0, {'msg': msg, 'lines': message_lines})
+                visible_messages.insert(0, {'msg': msg, 'lines': message_lines, 'content_lines': content_lines})
                 total_lines_used += message_lines
             else:
                 break
@@ -290,15 +809,18 @@ class CoquetteTUI:
             if current_line >= messages_start + messages_height:
                 break
                 
-            timestamp = msg['timestamp'].strftime("%H:%M:%S")
+            timestamp = msg.ts_text
+            if timestamp is None:
+                # Only messages that reach the screen pay for formatting, once
+                timestamp = msg.ts_text = time.strftime("%H:%M:%S", time.localtime(msg.timestamp))
             
             # Enhanced role and icon detection
-            if msg['role'] == 'user':
+            if msg.role == 'user':
                 role_icon = "👤"
                 color = curses.color_pair(1)
-            elif msg['role'] == 'system':
+            elif msg.role == 'system':
                 # Check if it's a tool blurb
-                if msg.get('tool'):
+                if msg.tool:
                     role_icon = "🔧"
                     color = curses.color_pair(4)  # Cyan for tools
                 else:
@@ -306,58 +828,63 @@ class CoquetteTUI:
                     color = curses.color_pair(3)  # Yellow for system
             else:  # assistant
                 # Check if it's an immediate personality acknowledgment
-                if msg.get('immediate') and msg.get('source') == 'personality_acknowledgment':
+                if msg.immediate and msg.source == 'personality_acknowledgment':
                     role_icon = "🎭"
                     color = curses.color_pair(6)  # Magenta for Ani
                 else:
                     role_icon = "🤖"
                     color = curses.color_pair(2)  # Blue for assistant
             
-            # Wrap long messages
-            content_lines = self.wrap_text(msg['content'], width - 20)
+            # Wrapped once above while working out which messages fit
+            content_lines = msg_data['content_lines']
             
             # Draw first line with timestamp and icon
             if content_lines and current_line < messages_start + messages_height:
                 first_line = f"{timestamp} {role_icon} {content_lines[0]}"
-                if len(first_line) > width - 2:
-                    first_line = first_line[:width-2]
-                self.stdscr.addstr(current_line, 1, first_line, color)
+                # addnstr clips to the screen width in C
+                self.stdscr.addnstr(current_line, 1, first_line, width - 2, color)
                 current_line += 1
                 
                 # Draw additional lines for wrapped content
                 for line in content_lines[1:]:
                     if current_line < messages_start + messages_height:
                         padded_line = f"           {line}"  # Indent continuation lines
-                        if len(padded_line) > width - 2:
-                            padded_line = padded_line[:width-2]
-                        self.stdscr.addstr(current_line, 1, padded_line, color)
+                        self.stdscr.addnstr(current_line, 1, padded_line, width - 2, color)
                         current_line += 1
                     else:
                         break
         
-        # Draw separator line above status
+    def draw_status(self, height, width):
+        """Draw the separator and status bar"""
         separator_y = height - 4
+        status_y = height - 3
+        self.clear_rows(separator_y, status_y + 1)
+        
+        # Draw separator line above status
         self.stdscr.addstr(separator_y, 1, "─" * (width - 2), curses.color_pair(3))
         
         # Draw status bar with smart truncation
-        status_y = height - 3
         status_text = self.status
         if len(status_text) > width - 4:
             # Truncate status but keep the most important parts
             status_text = status_text[:width-7] + "..."
         self.stdscr.addstr(status_y, 1, status_text, curses.color_pair(3))
         
-        # Draw input area with better wrapping
+    def draw_input(self, height, width):
+        """Draw the input prompt and cursor"""
         input_y = height - 2
+        self.clear_rows(input_y, input_y + 1)
+        
+        # Draw input area with better wrapping
         prompt = ">>> "
         
         # Handle input text wrapping
         available_width = width - len(prompt) - 3  # Leave space for prompt and margins
-        if len(self.current_input) > available_width:
+        if len(self.input_buffer) > available_width:
             # Show the end of long input with ellipsis
-            display_input = "..." + self.current_input[-(available_width-3):]
+            display_input = "..." + self.input_buffer[-(available_width-3):].decode('ascii')
         else:
-            display_input = self.current_input
+            display_input = self.input_buffer.decode('ascii')
             
         # Draw prompt and input
         self.stdscr.addstr(input_y, 1, prompt, curses.color_pair(1) | curses.A_BOLD)
@@ -367,8 +894,6 @@ class CoquetteTUI:
         cursor_x = 1 + len(prompt) + len(display_input)
         if cursor_x < width - 1:
             self.stdscr.addstr(input_y, cursor_x, "█", curses.color_pair(5) | curses.A_BLINK)
-            
-        self.stdscr.refresh()
         
     def draw_claude_raw_screen(self, height, width):
         """Draw Claude raw PTY output screen"""
@@ -391,16 +916,21 @@ class CoquetteTUI:
         output_start = 3
         output_height = height - 6
         
-        # Show recent Claude output
-        if self.claude_output_buffer:
-            display_lines = self.claude_output_buffer[-output_height:] if len(self.claude_output_buffer) > output_height else self.claude_output_buffer
+        # Show recent Claude output, ending with any line still being written
+        residual = self._line_residual
+        if self.claude_output_buffer or residual:
+            buffer_len = len(self.claude_output_buffer)
+            history_height = output_height - 1 if residual else output_height
+            display_lines = list(itertools.islice(self.claude_output_buffer, max(0, buffer_len - history_height), buffer_len))
+            if residual:
+                display_lines.append(residual)
             
             for i, line in enumerate(display_lines):
                 if i >= output_height:
                     break
                 try:
-                    # Clean ANSI codes and truncate if needed
-                    clean_line = line.replace('\x1b[2K', '').replace('\r', '')
+                    # ANSI codes were already stripped in read_claude_output; just truncate
+                    clean_line = line
                     if len(clean_line) > width - 4:
                         clean_line = clean_line[:width-7] + "..."
                     self.stdscr.addstr(output_start + i, 2, clean_line, curses.color_pair(4))
@@ -416,33 +946,31 @@ class CoquetteTUI:
         self.stdscr.addstr(separator_y, 1, "─" * (width - 2), curses.color_pair(3))
         
         prompt_y = height - 2
-        prompt_text = "Direct Claude input: " + self.current_input
+        prompt_text = "Direct Claude input: " + self.input_buffer.decode('ascii')
         if len(prompt_text) > width - 2:
             prompt_text = prompt_text[:width-5] + "..."
         self.stdscr.addstr(prompt_y, 1, prompt_text, curses.color_pair(4))
         
-        self.stdscr.refresh()
+        self.stdscr.noutrefresh()
+        
+    def wrapped_lines(self, msg, max_width):
+        """Wrap a message's content, caching the result on the message per width"""
+        if msg.wrap_cache is None:
+            msg.wrap_cache = {}
+        lines = msg.wrap_cache.get(max_width)
+        if lines is None:
+            lines = self.wrap_text(msg.content, max_width)
+            msg.wrap_cache[max_width] = lines
+        return lines
         
     def wrap_text(self, text, max_width):
         """Simple text wrapping"""
         if not text:
             return [""]
         
-        lines = []
-        current_line = ""
-        
-        for word in text.split():
-            if len(current_line + " " + word) <= max_width:
-                current_line = current_line + " " + word if current_line else word
-            else:
-                if current_line:
-                    lines.append(current_line)
-                current_line = word
-                
-        if current_line:
-            lines.append(current_line)
-            
-        return lines if lines else [""]
+        _wrapper.width = max(1, max_width)
+        # Collapse newlines and runs of spaces first, as splitting into words did
+        return _wrapper.wrap(' '.join(text.split())) or [""]
         
     def send_message(self, message):
         """Send message to TypeScript backend or Claude PTY"""
@@ -467,241 +995,138 @@ class CoquetteTUI:
         self.draw_screen()
         
         # Add user message immediately
-        self.messages.append({
-            'role': 'user',
-            'content': message,
-            'timestamp': datetime.now()
-        })
+        self.append_message('user', message)
         
         try:
-            # Call the existing TypeScript engine with longer timeout
-            cmd = ['npm', 'run', 'dev:direct', '--silent', '--', '--message', message]
-            
-            # Add provider flag
-            cmd.extend(['--provider', self.provider])
-            
-            # Add personality flag
-            cmd.extend(['--personality', self.personality])
+            # Drop output left over from an earlier request so it isn't blamed on this one
+            backend_closed = False
+            while True:
+                try:
+                    tag, data = self.response_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if data is None and tag != 'end':
+                    backend_closed = True
+            if backend_closed:
+                self.stop_backend()
             
-            # Add tools flag if tools are enabled
-            if self.provider == "local" and self.tools_enabled:
-                cmd.extend(['--tools', 'enabled'])
+            # Start (or restart) the long-lived TypeScript engine if needed
+            if backend_closed or not self.backend_process or self.backend_process.poll() is not None:
+                self.start_backend()
             
-            # Add conversation context flag
-            if self.conversation_context:
-                cmd.extend(['--context', 'enabled'])
+            request = {
+                'message': message,
+                'provider': self.provider,
+                'personality': self.personality,
+                'tools': self.provider == "local" and self.tools_enabled,
+                'context': self.conversation_context
+            }
             
-            self.log_debug("subprocess_call", "Calling TypeScript backend", {
-                "command": ' '.join(cmd),
-                "timeout": 360,
+            self.log_debug("backend_request", "Sending request to TypeScript backend", {
+                "pid": self.backend_process.pid,
                 "tools_enabled": self.tools_enabled,
                 "context_enabled": self.conversation_context
             })
             
-            # Use streaming subprocess for real-time progress updates
-            stdout_lines = []
-            stderr_lines = []
-            
-            process = subprocess.Popen(cmd, 
-                                     stdout=subprocess.PIPE, 
-                                     stderr=subprocess.PIPE,
-                                     text=True,
-                                     universal_newlines=True,
-                                     cwd='.')
+            self.backend_process.stdin.write(json.dumps(request).encode('utf-8') + b'\n')
+            self.backend_process.stdin.flush()
             
-            # Set up non-blocking reads
-            def make_non_blocking(fd):
-                flags = fcntl.fcntl(fd, fcntl.F_GETFL)
-                fcntl.fcntl(fd, fcntl.F_SETFL, flags | os.O_NONBLOCK)
+            # Raw bytes are accumulated and decoded once at the end
+            stdout_buf = bytearray()
+            stderr_buf = bytearray()
             
-            make_non_blocking(process.stdout.fileno())
-            make_non_blocking(process.stderr.fileno())
-            
-            # Process output in real-time
-            while True:
-                # Check if process is done
-                if process.poll() is not None:
-                    # Process finished, read any remaining output
-                    remaining_stdout = process.stdout.read()
-                    remaining_stderr = process.stderr.read()
-                    if remaining_stdout:
-                        stdout_lines.append(remaining_stdout)
-                    if remaining_stderr:
-                        stderr_lines.append(remaining_stderr)
-                        self.process_system_messages(remaining_stderr)
-                    break
-                
-                # Use select to check for available data
-                ready, _, _ = select.select([process.stdout, process.stderr], [], [], 0.1)
-                
-                for fd in ready:
+            # Process output in real-time until the response frame and the stderr end
+            # marker have both arrived, or the backend has closed its pipes
+            response = None
+            request_done = False
+            out_closed = err_closed = False
+            while not ((response is not None or out_closed) and (request_done or err_closed)):
+                # Wake up for throttled updates that still need a frame
+                try:
+                    tag, data = self.response_queue.get(
+                        timeout=_FRAME_INTERVAL if self._dirty else None)
+                except queue.Empty:
+                    self.process_system_messages()
+                    self.request_redraw()
+                    continue
+                if tag == 'end':
+                    request_done = True
+                elif data is None:
+                    # Backend exited; keep reading until both pipes are drained
+                    if tag == 'out':
+                        out_closed = True
+                    else:
+                        err_closed = True
+                elif tag == 'out':
                     try:
-                        if fd == process.stdout:
-                            data = fd.read()
-                            if data:
-                                stdout_lines.append(data)
-                        elif fd == process.stderr:
-                            data = fd.read()
-                            if data:
-                                stderr_lines.append(data)
-                                # Process system messages in real-time
-                                self.process_system_messages(data)
-                                # Force screen refresh to show updates
-                                if not self.copy_mode:
-                                    self.draw_screen()
-                    except IOError:
-                        # No data available yet
-                        pass
-                
-                # Small delay to prevent CPU spinning
-                time.sleep(0.05)
+                        frame = _loads(data)
+                    except ValueError:
+                        frame = None
+                    if isinstance(frame, dict) and frame.get('type') in ('response', 'error'):
+                        response = frame
+                    else:
+                        # Anything else on stdout is stray engine output
+                        stdout_buf += data
+                else:
+                    stderr_buf += data
+                    # Apply engine events parsed so far by the stderr thread
+                    self.process_system_messages()
+                    self.request_redraw()
             
-            # Wait for process to complete and get return code
-            return_code = process.wait()
+            # The end marker arrives after every event of this request, so draining
+            # the whole queue keeps acknowledgments above the answer
+            self.process_system_messages(max_events=None)
             
-            # Combine all output
-            full_stdout = ''.join(stdout_lines)
-            full_stderr = ''.join(stderr_lines)
+            full_stdout = stdout_buf.decode('utf-8', errors='replace')
+            full_stderr = stderr_buf.decode('utf-8', errors='replace')
             
-            self.log_debug("subprocess_result", "TypeScript backend response", {
-                "return_code": return_code,
+            self.log_debug("backend_result", "TypeScript backend response", {
+                "response_type": response.get('type') if response else None,
                 "stdout_length": len(full_stdout),
                 "stderr_length": len(full_stderr),
                 "stdout_preview": full_stdout[:200] if full_stdout else "",
-                "stderr_preview": full_stderr[:200] if full_stderr else "",
-                "full_stdout": full_stdout if len(full_stdout) < 10000 else full_stdout[:10000] + "...[TRUNCATED]"
+                "stderr_preview": full_stderr[:200] if full_stderr else ""
             })
                                   
-            if return_code == 0:
-                # stderr was already processed in real-time, no need to process again
-                
-                # Clean stdout - remove any npm output lines
-                clean_stdout = full_stdout.strip()
+            if response and response['type'] == 'response':
+                response_content = response.get('content', 'No response')
                 
-                # Try to extract the REAL response JSON, not examples from system prompts
-                # Look for JSON objects that contain "content" and "metadata" fields
-                json_candidates = []
-                brace_count = 0
-                start_pos = -1
-                
-                for i, char in enumerate(clean_stdout):
-                    if char == '{':
-                        if brace_count == 0:
-                            start_pos = i
-                        brace_count += 1
-                    elif char == '}':
-                        brace_count -= 1
-                        if brace_count == 0 and start_pos != -1:
-                            potential_json = clean_stdout[start_pos:i+1]
-                            try:
-                                parsed = json.loads(potential_json)
-                                # Only accept JSON objects that look like real responses
-                                if isinstance(parsed, dict) and 'content' in parsed and 'metadata' in parsed:
-                                    json_candidates.append((potential_json, start_pos))
-                            except:
-                                pass
-                            start_pos = -1
-                
-                if json_candidates:
-                    # Use the last valid response JSON (most complete)
-                    clean_json, json_start = json_candidates[-1]
-                else:
-                    # Fallback to old method if no valid response found
-                    json_start = clean_stdout.find('{')
-                    if json_start != -1:
-                        json_part = clean_stdout[json_start:]
-                        brace_count = 0
-                        json_end = -1
-                        for i, char in enumerate(json_part):
-                            if char == '{':
-                                brace_count += 1
-                            elif char == '}':
-                                brace_count -= 1
-                                if brace_count == 0:
-                                    json_end = i + 1
-                                    break
-                        
-                        if json_end != -1:
-                            clean_json = json_part[:json_end]
-                        else:
-                            clean_json = json_part
-                    else:
-                        clean_json = clean_stdout
+                # Clean up response formatting - remove markdown styling
+                response_content = self.clean_response_formatting(response_content)
                 
-                self.log_debug("json_extraction", "Attempted to extract JSON", {
-                    "original_length": len(clean_stdout),
-                    "extracted_json": clean_json[:200] + "..." if len(clean_json) > 200 else clean_json,
-                    "json_start_pos": json_start
+                self.log_debug("response_parsed", "Successfully parsed JSON response", {
+                    "content_length": len(response_content),
+                    "metadata": response.get('metadata', {}),
+                    "full_response": response
                 })
                 
-                # Parse response (assuming JSON output)
-                try:
-                    response = json.loads(clean_json)
-                    response_content = response.get('content', 'No response')
-                    
-                    # Clean up response formatting - remove markdown styling
-                    response_content = self.clean_response_formatting(response_content)
-                    
-                    self.log_debug("response_parsed", "Successfully parsed JSON response", {
-                        "content_length": len(response_content),
-                        "metadata": response.get('metadata', {}),
-                        "full_response": response
-                    })
-                    
-                    self.messages.append({
-                        'role': 'assistant', 
-                        'content': response_content,
-                        'timestamp': datetime.now()
-                    })
-                except json.JSONDecodeError as e:
-                    # Fallback to plain text
-                    fallback_content = clean_stdout if clean_stdout else "No response"
-                    
-                    self.log_debug("response_fallback", "JSON parse failed, using plain text", {
-                        "json_error": str(e),
-                        "fallback_content": fallback_content[:200],
-                        "raw_stdout": full_stdout[:500],
-                        "cleaned_json": clean_json[:200]
-                    })
-                    
-                    self.messages.append({
-                        'role': 'assistant',
-                        'content': fallback_content,
-                        'timestamp': datetime.now()
-                    })
+                self.append_message('assistant', response_content)
             else:
-                error_msg = full_stderr or 'Command failed'
-                self.log_debug("subprocess_error", "TypeScript backend failed", {
-                    "return_code": return_code,
+                if response:
+                    error_msg = response.get('error') or 'Command failed'
+                else:
+                    error_msg = full_stderr or 'Backend exited unexpectedly'
+                    self.backend_process.wait()
+                self.log_debug("backend_error", "TypeScript backend failed", {
+                    "return_code": self.backend_process.poll(),
                     "error": error_msg,
+                    "details": response.get('details', '') if response else "",
                     "stdout": full_stdout[:200] if full_stdout else ""
                 })
                 
-                self.messages.append({
-                    'role': 'assistant',
-                    'content': f"Error: {error_msg}",
-                    'timestamp': datetime.now()
-                })
+                self.append_message('assistant', f"Error: {error_msg}")
                 
         except subprocess.TimeoutExpired:
             self.log_debug("subprocess_timeout", "TypeScript backend timed out", {
                 "timeout": 180
             })
-            self.messages.append({
-                'role': 'assistant',
-                'content': "Error: Request timed out",
-                'timestamp': datetime.now()
-            })
+            self.append_message('assistant', "Error: Request timed out")
         except Exception as e:
             self.log_debug("subprocess_exception", "Exception during TypeScript call", {
                 "exception": str(e),
                 "exception_type": type(e).__name__
             })
-            self.messages.append({
-                'role': 'assistant',
-                'content': f"Error: {str(e)}",
-                'timestamp': datetime.now()
-            })
+            self.append_message('assistant', f"Error: {str(e)}")
             
         self.thinking = False
         self.current_tool_activity = ""  # Clear any tool activity
@@ -711,276 +1136,239 @@ class CoquetteTUI:
         self.last_response_time = time.time() - start_time
         self.total_messages_processed += 1
         
+        # The reply and the response time in the title both live in the messages region
+        self._dirty.add('messages')
         self.update_status()
 
     def should_ignore_message(self, message, msg_type):
         """Filter out debug noise - only show user-relevant progress updates"""
-        if msg_type == 'error':
-            # Only show user-relevant errors, not internal debugging ones
-            return 'all_json_blocks_failed' in message or 'deepseek_json_debug' in message
-        
-        if msg_type != 'engine':
-            return False  # Always show non-engine messages
-            
-        # Ignore detailed debugging messages
-        debug_noise_keywords = [
-            'ollama_request_enqueued',
-            'ollama_queue_reordered', 
-            'ollama_request_processing_start',
-            'ollama_api_call_start',
-            'ollama_model_switch_delay',
-            'ollama_queue_processing_start',
-            'ollama_queue_processing_complete',
-            'intent_calling_gemma',
-            'intent_gemma_response',
-            'intent_parsing_response', 
-            'intent_parsed_successfully',
-            'deepseek_json_debug',
-            'error_context_agent_initializing',
-            'error_context_agent_initialized',
-            'component_status_changed',
-            'processMessage_start',
-            'input_routing_start',
-            'input_routing_complete',
-            'recursive_validation_iteration',
-            'recursive_validation_analysis',
-            'recursive_validation_satisfied'
-        ]
-        
-        # Show these important progress messages
-        important_keywords = [
-            'system_state_changed',
-            'intelligence_router_start',
-            'intelligence_router_complete',
-            'tools_agent_start',
-            'tools_agent_executing_step',
-            'subconscious_reasoning_start',
-            'subconscious_reasoning_complete',
-            'personality_interpretation_start',
-            'personality_interpretation_success',
-            'ollama_request_success'  # Show completions but not detailed debug
-        ]
-        
-        # Check if message contains debug noise
-        for noise in debug_noise_keywords:
-            if noise in message:
-                return True
-                
-        # Check if message contains important updates
-        for important in important_keywords:
-            if important in message:
-                return False
-                
-        # Default: ignore other engine messages to reduce noise
-        return True
+        return _ignore_decision(message, msg_type)
 
-    def process_system_messages(self, stderr_output):
-        """Process system messages from stderr to update status and show personality responses"""
+    def parse_system_message(self, line):
+        """Parse and filter one raw stderr line on the reader thread
+        
+        Returns (handler, msg, message, metadata) for events the UI should
+        apply, or None for noise and non-JSON output.
+        """
+        line = line.strip()
+        if not line.startswith(b'{'):
+            return None
+        
+        # Most engine lines are debug noise; screen them on the raw event
+        # name so filtered lines never pay for a full parse
+        event = engine_event_name(line)
+        if event is not None and self.should_ignore_message(event, TYPE_ENGINE):
+            return None
+        
+        try:
+            msg = _loads(line)
+        except ValueError:
+            # Skip lines that aren't valid JSON (both parsers raise ValueError subclasses)
+            return None
+        if not isinstance(msg, dict):
+            return None
+        
         try:
-            # Split stderr into lines and process each JSON message
-            lines = stderr_output.strip().split('\n')
+            msg_type = msg.get('type', '')
+            if type(msg_type) is str:
+                # Decoded strings are fresh objects; interning lets the
+                # lookups below match on identity
+                msg_type = sys.intern(msg_type)
+            message = msg.get('message', '')
             
-            for line in lines:
-                if not line.strip():
-                    continue
-                    
-                try:
-                    # Try to parse each line as JSON
-                    msg = json.loads(line)
-                    
-                    if isinstance(msg, dict):
-                        msg_type = msg.get('type', '')
-                        message = msg.get('message', '')
-                        metadata = msg.get('metadata', {})
-                        
-                        # Filter out debug noise - only process user-relevant messages
-                        if self.should_ignore_message(message, msg_type):
-                            continue
-                        
-                        # Handle immediate assistant messages (personality acknowledgments)
-                        if msg_type == 'assistant_message':
-                            content = msg.get('content', '')
-                            source = metadata.get('source', '')
-                            if content.strip():
-                                # Add special prefix for personality acknowledgments
-                                if source == 'personality_acknowledgment':
-                                    content = f"🎭 {content}"
-                                
-                                self.messages.append({
-                                    'role': 'assistant',
-                                    'content': content,
-                                    'timestamp': datetime.now(),
-                                    'immediate': True,
-                                    'source': source
-                                })
-                                # Force screen refresh to show message immediately
-                                if not self.copy_mode:
-                                    self.draw_screen()
-
-                        # Handle tool activity updates
-                        elif msg_type == 'tool_activity':
-                            activity = msg.get('activity', '')
-                            tool_name = msg.get('tool_name', '')
-                            if activity.strip():
-                                self.current_tool_activity = activity
-                                self.tool_start_time = time.time()
-                                self.tool_progress_dots = 0
-                            else:
-                                # Clear tool activity
-                                self.current_tool_activity = ""
-                                self.tool_start_time = None
-                            
-                            self.update_status()
-                            # Force status refresh
-                            if not self.copy_mode:
-                                self.draw_screen()
-
-                        # Handle tool execution blurbs
-                        elif msg_type == 'tool_blurb':
-                            content = msg.get('content', '')
-                            tool_name = msg.get('tool_name', '')
-                            if content.strip():
-                                self.messages.append({
-                                    'role': 'system',
-                                    'content': f"🔧 {content}",
-                                    'timestamp': datetime.now(),
-                                    'tool': tool_name
-                                })
-                                # Force screen refresh
-                                if not self.copy_mode:
-                                    self.draw_screen()
-                        
-                        # Handle system state changes (like "Ani is ready")
-                        elif msg_type == 'engine' and 'system_state_changed' in message:
-                            status = metadata.get('status', '')
-                            status_message = metadata.get('message', '')
-                            
-                            if status == 'ready' and status_message:
-                                # Show the ready message as a system message
-                                self.messages.append({
-                                    'role': 'system',
-                                    'content': status_message,
-                                    'timestamp': datetime.now()
-                                })
-                                self.status = f"Status: Ready"
-                                
-                        # Handle file operations acknowledgments from personality
-                        elif msg_type == 'engine' and 'file_operations_user_acknowledgment' in message:
-                            acknowledgment = metadata.get('acknowledgment', '')
-                            if acknowledgment.strip():
-                                # This is Ani's warm response before starting work
-                                self.messages.append({
-                                    'role': 'assistant',
-                                    'content': acknowledgment,
-                                    'timestamp': datetime.now()
-                                })
-                                
-                        # Handle other engine events for status updates
-                        elif msg_type == 'engine':
-                            if 'loading_personality' in message:
-                                personality_name = metadata.get('message', 'personality')
-                                self.status = f"Loading {personality_name}..."
-                            elif 'file_operations_calling_gemma' in message:
-                                self.status = "Planning file operations..."
-                            elif 'file_operation_executing' in message:
-                                operation = metadata.get('operation', 'operation')
-                                self.status = f"Executing: {operation}"
-                            elif 'personalizing' in message or 'personality_interpretation' in message:
-                                self.status = "Personalizing response..."
-                            elif 'intent_classification' in message:
-                                self.status = "🧠 Analyzing intent..."
-                                self.current_tool_activity = "analyzing user intent"
-                                self.tool_start_time = time.time()
-                            elif 'intelligence_router' in message:
-                                self.status = "🤖 Selecting optimal model..."
-                                self.current_tool_activity = "routing to best AI model"
-                                self.tool_start_time = time.time()
-                            elif 'tools_agent_start' in message:
-                                self.status = "🔧 Planning tool execution..."
-                                self.current_tool_activity = "planning tool steps"
-                                self.tool_start_time = time.time()
-                            elif 'tools_agent_executing_step' in message:
-                                step_data = metadata.get('step', {})
-                                tool_name = step_data.get('tool', 'unknown')
-                                description = step_data.get('description', '')
-                                self.current_tool_activity = f"executing {tool_name}"
-                                if description:
-                                    self.status = f"🔧 {description}..."
-                                else:
-                                    self.status = f"🔧 Executing {tool_name}..."
-                                self.tool_start_time = time.time()
-                            elif 'recursive_validation' in message:
-                                self.status = "🔍 Validating results recursively..."
-                                self.current_tool_activity = "recursive validation"
-                                self.tool_start_time = time.time()
-                            elif 'subconscious_reasoning' in message:
-                                self.status = "🧠 Deep reasoning with DeepSeek..."
-                                self.current_tool_activity = "deep subconscious analysis"
-                                self.tool_start_time = time.time()
-                            elif 'deepseek_attempt' in message:
-                                attempt = metadata.get('attempt', 1)
-                                self.status = f"🧠 DeepSeek thinking (attempt {attempt})..."
-                                self.current_tool_activity = f"DeepSeek reasoning (try {attempt})"
-                            elif 'personality_interpretation' in message:
-                                self.status = "🎭 Ani interpreting response..."
-                                self.current_tool_activity = "personality interpretation"
-                                self.tool_start_time = time.time()
-                            elif 'thinking' in message:
-                                thinking_msg = metadata.get('message', 'Thinking...')
-                                self.status = f"💭 {thinking_msg}"
-                                self.current_tool_activity = "thinking"
-                                self.tool_start_time = time.time()
-                            elif '_complete' in message or '_success' in message:
-                                # Clear tool activity when operations complete
-                                self.current_tool_activity = ""
-                                self.tool_start_time = None
-                                self.status = "✅ Task completed"
-                            elif '_failed' in message or 'error' in message.lower():
-                                # Clear tool activity on error but show error status
-                                self.current_tool_activity = ""
-                                self.tool_start_time = None
-                                error_msg = metadata.get('error', 'Unknown error')
-                                self.status = f"❌ Error: {error_msg[:50]}..."
-                                
-                except json.JSONDecodeError:
-                    # Skip lines that aren't valid JSON
-                    continue
-                    
+            # Filter out debug noise - only process user-relevant messages
+            if self.should_ignore_message(message, msg_type):
+                return None
+            
+            handler = self._msg_handlers.get(msg_type)
+            if handler is None:
+                return None
+            
+            # Read once here; handlers take these instead of re-reading msg
+            return handler, msg, message, msg.get('metadata') or EMPTY_DICT
         except Exception as e:
-            # Log any processing errors but don't crash
-            self.log_debug("system_message_error", f"Error processing system messages: {e}", {
-                "stderr_preview": stderr_output[:200] if stderr_output else "",
+            self.log_debug("system_message_error", f"Error parsing system message: {e}", {
+                "stderr_preview": line[:200].decode('utf-8', errors='replace'),
                 "error": str(e)
             })
+            return None
+        
+    def process_system_messages(self, max_events=_EVENTS_PER_TICK):
+        """Apply engine events queued by the stderr thread to update status and show personality responses
+        
+        max_events=None drains the queue completely.
+        """
+        for _ in (itertools.count() if max_events is None else range(max_events)):
+            try:
+                handler, msg, message, metadata = self.event_queue.get_nowait()
+            except queue.Empty:
+                return
+            
+            # Engine events can append messages and rewrite the status line
+            self._dirty.update(('messages', 'status'))
+            try:
+                handler(msg, message, metadata)
+            except Exception as e:
+                # Log any processing errors but don't crash
+                self.log_debug("system_message_error", f"Error processing system messages: {e}", {
+                    "message": str(message)[:200],
+                    "error": str(e)
+                })
+        
+    def handle_assistant_message(self, msg, message, metadata):
+        """Immediate assistant messages (personality acknowledgments)"""
+        content = msg.get('content', '')
+        source = metadata.get('source', '')
+        if content.strip():
+            # Add special prefix for personality acknowledgments
+            if source == 'personality_acknowledgment':
+                content = f"🎭 {content}"
+            
+            self.append_message('assistant', content, immediate=True, source=source)
+            # Show the message on the next frame
+            self.request_redraw()
+        
+    def handle_tool_activity(self, msg, message, metadata):
+        """Tool activity updates for the status line"""
+        activity = msg.get('activity', '')
+        if activity.strip():
+            self.current_tool_activity = activity
+            self.tool_start_time = time.time()
+            self.tool_progress_dots = 0
+        else:
+            # Clear tool activity
+            self.current_tool_activity = ""
+            self.tool_start_time = None
+        
+        self.update_status()
+        self.request_redraw()
+        
+    def handle_tool_blurb(self, msg, message, metadata):
+        """Tool execution blurbs"""
+        content = msg.get('content', '')
+        tool_name = msg.get('tool_name', '')
+        if content.strip():
+            self.append_message('system', f"🔧 {content}", tool=tool_name)
+            self.request_redraw()
+        
+    def handle_engine(self, msg, message, metadata):
+        """Engine events: state changes, acknowledgments and status updates"""
+        route = _engine_route(message)
+        if route is not None:
+            self._engine_handlers[route](metadata)
+        
+    def on_state_changed(self, metadata):
+        """System state changes (like "Ani is ready")"""
+        status = metadata.get('status', '')
+        status_message = metadata.get('message', '')
+        
+        if status == 'ready' and status_message:
+            # Show the ready message as a system message
+            self.append_message('system', status_message)
+            self.status = f"Status: Ready"
+        
+    def on_file_ops_acknowledgment(self, metadata):
+        """File operations acknowledgments from personality"""
+        acknowledgment = metadata.get('acknowledgment', '')
+        if acknowledgment.strip():
+            # This is Ani's warm response before starting work
+            self.append_message('assistant', acknowledgment)
+        
+    def on_loading_personality(self, metadata):
+        personality_name = metadata.get('message', 'personality')
+        self.status = f"Loading {personality_name}..."
+        
+    def on_file_ops_planning(self, metadata):
+        self.status = "Planning file operations..."
+        
+    def on_file_operation_executing(self, metadata):
+        operation = metadata.get('operation', 'operation')
+        self.status = f"Executing: {operation}"
+        
+    def on_personalizing(self, metadata):
+        self.status = "Personalizing response..."
+        
+    def on_intent_classification(self, metadata):
+        self.status = "🧠 Analyzing intent..."
+        self.current_tool_activity = "analyzing user intent"
+        self.tool_start_time = time.time()
+        
+    def on_intelligence_router(self, metadata):
+        self.status = "🤖 Selecting optimal model..."
+        self.current_tool_activity = "routing to best AI model"
+        self.tool_start_time = time.time()
+        
+    def on_tools_agent_start(self, metadata):
+        self.status = "🔧 Planning tool execution..."
+        self.current_tool_activity = "planning tool steps"
+        self.tool_start_time = time.time()
+        
+    def on_tools_agent_step(self, metadata):
+        step_data = metadata.get('step') or EMPTY_DICT
+        tool_name = step_data.get('tool', 'unknown')
+        description = step_data.get('description', '')
+        self.status, self.current_tool_activity = _exec_status(tool_name, description)
+        self.tool_start_time = time.time()
+        
+    def on_recursive_validation(self, metadata):
+        self.status = "🔍 Validating results recursively..."
+        self.current_tool_activity = "recursive validation"
+        self.tool_start_time = time.time()
+        
+    def on_subconscious_reasoning(self, metadata):
+        self.status = "🧠 Deep reasoning with DeepSeek..."
+        self.current_tool_activity = "deep subconscious analysis"
+        self.tool_start_time = time.time()
+        
+    def on_deepseek_attempt(self, metadata):
+        attempt = metadata.get('attempt', 1)
+        if type(attempt) is int and 0 <= attempt < len(_DEEPSEEK_STATUSES):
+            self.status, self.current_tool_activity = _DEEPSEEK_STATUSES[attempt]
+        else:
+            self.status = f"🧠 DeepSeek thinking (attempt {attempt})..."
+            self.current_tool_activity = f"DeepSeek reasoning (try {attempt})"
+        
+    def on_thinking(self, metadata):
+        thinking_msg = metadata.get('message', 'Thinking...')
+        self.status = f"💭 {thinking_msg}"
+        self.current_tool_activity = "thinking"
+        self.tool_start_time = time.time()
+        
+    def on_complete(self, metadata):
+        # Clear tool activity when operations complete
+        self.current_tool_activity = ""
+        self.tool_start_time = None
+        self.status = "✅ Task completed"
+        
+    def on_failed(self, metadata):
+        # Clear tool activity on error but show error status
+        self.current_tool_activity = ""
+        self.tool_start_time = None
+        error_msg = metadata.get('error', 'Unknown error')
+        self.status = f"❌ Error: {error_msg[:50]}..."
         
     def clean_response_formatting(self, content):
         """Clean up response formatting - remove markdown styling for cleaner chat"""
         if not content:
             return content
             
-        # Remove common markdown formatting
-        content = content.replace('*', '')  # Remove asterisks (bold/italic)
-        content = content.replace('_', '')  # Remove underscores (italic)
-        content = content.replace('**', '') # Remove bold markers
-        content = content.replace('__', '') # Remove bold underscores
+        # Remove common markdown formatting (single chars also cover ** and __)
+        content = content.translate(_MARKDOWN_STRIP)
         
         # Clean up excessive spacing and newlines
-        import re
-        content = re.sub(r'\n{3,}', '\n\n', content)  # Max 2 consecutive newlines
-        content = re.sub(r' {2,}', ' ', content)      # Max 1 consecutive space
+        content = _MULTI_NL_RE.sub('\n\n', content)  # Max 2 consecutive newlines
+        content = _MULTI_SP_RE.sub(' ', content)      # Max 1 consecutive space
         
         # Remove escape characters that might mess up terminal
-        content = content.replace('\\"', '"')
-        content = content.replace('\\n', '\n')
+        content = _ESCAPES_RE.sub(lambda m: _ESCAPE_CHARS[m.group(1)], content)
         
         return content.strip()
         
     def handle_shortcuts(self, ch):
         """Handle keyboard shortcuts - stolen from working claude-condom"""
         if ch == 20:  # Ctrl+T - Toggle provider (claude → gemini → local)
-            providers = ["claude", "gemini", "local"]
-            current_idx = providers.index(self.provider) if self.provider in providers else 0
-            new_provider = providers[(current_idx + 1) % len(providers)]
+            # Unknown values step as if they were the first entry
+            new_provider = _NEXT_PROVIDER.get(self.provider, "gemini")
             
             self.log_debug("provider_toggle", "Provider toggled", {
                 "old_provider": self.provider,
@@ -1009,20 +1397,16 @@ class CoquetteTUI:
             return True
             
         elif ch == 16:  # Ctrl+P - Toggle personality
-            personalities = ["ani", "professional", "casual"]
-            current_idx = personalities.index(self.personality) if self.personality in personalities else 0
-            self.personality = personalities[(current_idx + 1) % len(personalities)]
+            self.personality = _NEXT_PERSONALITY.get(self.personality, "professional")
             self.update_status()
             return True
             
         elif ch == 22:  # Ctrl+V - Toggle view (personality/claude_raw)
-            if self.view_mode == "personality":
-                self.view_mode = "claude_raw"
-            else:
-                self.view_mode = "personality"
+            old_view = self.view_mode
+            self.view_mode = _NEXT_VIEW.get(old_view, "personality")
             
             self.log_debug("view_toggle", "View mode toggled", {
-                "old_view": "claude_raw" if self.view_mode == "personality" else "personality",
+                "old_view": old_view,
                 "new_view": self.view_mode
             })
             self.update_status()
@@ -1070,17 +1454,17 @@ class CoquetteTUI:
         self.update_status()
         
         # Add enhanced welcome message with help
-        self.messages.append({
-            'role': 'assistant', 
-            'content': '🎭 Welcome to Coquette Enhanced! \n\nNew Features:\n• Real-time tool activity visualization\n• Animated progress indicators\n• Performance metrics\n• Enhanced Ani personality responses\n• Tool execution blurbs\n\nShortcuts:\n• Ctrl+T: Provider (claude→gemini→local)\n• Ctrl+L: Context (🧠/🔄)\n• Ctrl+P: Personality (ani→prof→casual)\n• Ctrl+O: Tools (local: 💬/🔧)\n• Ctrl+V: View (personality/raw)\n• Ctrl+R: Copy mode\n• Ctrl+C: Exit\n\nType a message to see the enhanced visual feedback in action!',
-            'timestamp': datetime.now()
-        })
+        self.append_message('assistant', _WELCOME_CONTENT)
         
         while True:
+            # Apply engine events that arrived since the last tick
+            self.process_system_messages()
+            
             # Only redraw if not in copy mode
-            if not self.copy_mode:
-                self.draw_screen()
+            self.request_redraw()
             
+            # Poll again within a frame when a throttled update is still pending
+            self.stdscr.timeout(_FRAME_MS if self._dirty and not self.copy_mode else 100)
             ch = self.stdscr.getch()
             
             if ch == -1:  # No input (timeout)
@@ -1098,18 +1482,19 @@ class CoquetteTUI:
                 continue
                 
             # Handle input
+            self._dirty.add('input')
             if ch in [10, 13]:  # Enter
-                if self.current_input.strip():
-                    message = self.current_input.strip()
-                    self.current_input = ""
+                message = self.input_buffer.decode('ascii').strip()
+                if message:
+                    self.input_buffer.clear()
                     self.send_message(message)
                     
             elif ch in [8, 127, curses.KEY_BACKSPACE]:  # Backspace
-                if self.current_input:
-                    self.current_input = self.current_input[:-1]
+                if self.input_buffer:
+                    self.input_buffer.pop()
                     
             elif 32 <= ch <= 126:  # Printable characters
-                self.current_input += chr(ch)
+                self.input_buffer.append(ch)
 
 def main():
     tui = CoquetteTUI()
@@ -1120,6 +1505,10 @@ def main():
         print("\nGoodbye!")
     except Exception as e:
         print(f"Error: {e}")
+    finally:
+        tui.stop_claude_pty()
+        tui.stop_backend()
+        tui.close_debug_logging()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -3,13 +3,69 @@
 /**
  * Direct CLI interface for Coquette - bypasses the broken React/Ink TUI
  * This provides a simple interface that the Python TUI can call
+ *
+ * Two modes:
+ *   --message "..."  Process a single message and exit
+ *   --serve          Stay running and process one JSON request per stdin line
  */
 
+import * as readline from 'readline';
 import { CoquetuteEngine } from './core/CoquetuteEngine.js';
 import { Config } from './core/config/config.js';
 
-async function main() {
-  const args = process.argv.slice(2);
+interface DirectOptions {
+  provider?: string;
+  personality?: string;
+  toolsEnabled: boolean;
+  contextEnabled: boolean;
+}
+
+async function createEngine(options: DirectOptions): Promise<CoquetuteEngine> {
+  // Initialize engine with proper mode based on flags
+  const config = new Config({
+    sessionId: 'direct-cli-session',
+    model: 'default',
+    targetDir: process.cwd(),
+    debugMode: false,
+    cwd: process.cwd(),
+    // Add other config parameters as needed based on your Config class constructor
+  });
+  await config.initialize();
+  const engine = new CoquetuteEngine(config);
+  
+  // Set provider and personality if specified (before initialization)
+  const configManager = (await import('./core/config/manager.js')).configManager;
+  await configManager.load();
+  
+  if (options.provider) {
+    if (options.provider.toLowerCase() === 'local') {
+      configManager.setProvider('ollama_local');
+    } else {
+      configManager.setProvider(options.provider);
+    }
+  }
+  
+  if (options.personality) {
+    configManager.setPersonality(options.personality);
+  }
+  
+  // Set mode based on tools/context flags
+  const mode = {
+    local_only: options.toolsEnabled, // When tools are enabled, use local mode
+    with_tools: options.toolsEnabled,
+    streaming: false,
+    debug: false,
+    personality_only: false,
+    approval_mode: 'auto' as const,
+    personality_interpretation: true,
+    context_persistence: options.contextEnabled
+  };
+  
+  await engine.initialize(mode);
+  return engine;
+}
+
+async function runOnce(args: string[]) {
   const messageIndex = args.findIndex(arg => arg === '--message');
   
   if (messageIndex === -1 || messageIndex === args.length - 1) {
@@ -31,47 +87,7 @@ async function main() {
   const personality = personalityIndex !== -1 && personalityIndex < args.length - 1 ? args[personalityIndex + 1] : undefined;
   
   try {
-    // Initialize engine with proper mode based on flags
-    const config = new Config({
-      sessionId: 'direct-cli-session',
-      model: 'default',
-      targetDir: process.cwd(),
-      debugMode: false,
-      cwd: process.cwd(),
-      // Add other config parameters as needed based on your Config class constructor
-    });
-    await config.initialize();
-    const engine = new CoquetuteEngine(config);
-    
-    // Set provider and personality if specified (before initialization)
-    const configManager = (await import('./core/config/manager.js')).configManager;
-    await configManager.load();
-    
-    if (provider) {
-      if (provider.toLowerCase() === 'local') {
-        configManager.setProvider('ollama_local');
-      } else {
-        configManager.setProvider(provider);
-      }
-    }
-    
-    if (personality) {
-      configManager.setPersonality(personality);
-    }
-    
-    // Set mode based on tools/context flags
-    const mode = {
-      local_only: toolsEnabled, // When tools are enabled, use local mode
-      with_tools: toolsEnabled,
-      streaming: false,
-      debug: false,
-      personality_only: false,
-      approval_mode: 'auto' as const,
-      personality_interpretation: true,
-      context_persistence: contextEnabled
-    };
-    
-    await engine.initialize(mode);
+    const engine = await createEngine({ provider, personality, toolsEnabled, contextEnabled });
     
     // Process message with tool and context options
     const response = await engine.processMessage(userMessage, { 
@@ -100,6 +116,78 @@ async function main() {
   }
 }
 
+async function serve() {
+  // The engine is reused across requests and only rebuilt when the
+  // provider, personality or tools/context flags change
+  let engine: CoquetuteEngine | null = null;
+  let engineKey = '';
+  
+  const rl = readline.createInterface({ input: process.stdin, terminal: false });
+  
+  for await (const line of rl) {
+    if (!line.trim()) {
+      continue;
+    }
+    
+    try {
+      const request = JSON.parse(line);
+      const options: DirectOptions = {
+        provider: request.provider,
+        personality: request.personality,
+        toolsEnabled: Boolean(request.tools),
+        contextEnabled: Boolean(request.context)
+      };
+      
+      const key = JSON.stringify(options);
+      if (!engine || key !== engineKey) {
+        engine = await createEngine(options);
+        engineKey = key;
+      }
+      
+      // Without context each message starts from a clean history, as a fresh process would
+      if (!options.contextEnabled) {
+        engine.clearHistory();
+      }
+      
+      const response = await engine.processMessage(request.message, {
+        stream: false
+      });
+      
+      // One frame per request on stdout; stderr keeps carrying engine events
+      if ('content' in response) {
+        process.stdout.write(JSON.stringify({
+          type: 'response',
+          content: response.content,
+          metadata: response.metadata,
+          timestamp: response.timestamp
+        }) + '\n');
+      } else {
+        process.stdout.write(JSON.stringify({ type: 'error', error: 'Invalid response format' }) + '\n');
+      }
+      
+    } catch (error: any) {
+      process.stdout.write(JSON.stringify({
+        type: 'error',
+        error: error.message || 'Unknown error occurred',
+        details: error.stack
+      }) + '\n');
+    }
+    
+    // Tells the TUI that everything this request wrote to stderr has been sent
+    process.stderr.write(JSON.stringify({ type: 'request_end' }) + '\n');
+  }
+}
+
+async function main() {
+  const args = process.argv.slice(2);
+  
+  if (args.includes('--serve')) {
+    await serve();
+  } else {
+    await runOnce(args);
+  }
+}
+
 main().catch(error => {
   console.error(JSON.stringify({ 
     error: 'Fatal error: ' + (error.message || String(error)) 